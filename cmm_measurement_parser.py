@@ -20,8 +20,37 @@ License: MIT
 import pandas as pd
 import re
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
 import datetime
+import functools
+import warnings
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional, only needed for dtype_backend='pyarrow'
+    pa = None
+
+try:
+    import xlsxwriter
+except ImportError:  # optional, export_to_excel falls back to openpyxl
+    xlsxwriter = None
+
+
+_re_circle_number = re.compile(r'円(\d+)')
+_re_d_number = re.compile(r'ｄ-(\d+)')
+
+
+@functools.lru_cache(maxsize=None)
+def _extract_element_number(element_name: str) -> int:
+    """Numeric part of a 円/ｄ- element name used as its sort key (0 if none)."""
+    if "円" in element_name:
+        match = _re_circle_number.search(element_name)
+        return int(match.group(1)) if match else 0
+    elif "ｄ-" in element_name:
+        match = _re_d_number.search(element_name)
+        return int(match.group(1)) if match else 0
+    return 0
+
 
 class CMMParser:
     """
@@ -66,301 +95,551 @@ class CMMParser:
             'value': '値'
         }
         
-    def parse_lines_to_dataframe(self, lines: List[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
+        # Precompiled patterns (shared by all parsing methods)
+        element_type_words = r'円\(最小二乗法\)|平面\(最小二乗法\)|直線\(最小二乗法\)|基本座標系|3次元直線|点|2D距離'
+        element_types = r'(' + element_type_words + r')'
+        header_words = r'CARL ZEISS|CALYPSO|測定ﾌﾟﾗﾝ|ACCURA|名前|説明|実測値|基準値|上許容差|下許容誤差|ﾋｽﾄｸﾞﾗﾑ'
+        xy_header_words = r'ｺﾝﾊﾟｸﾄﾌﾟﾘﾝﾄｱｳﾄ|ｵﾍﾟﾚｰﾀ|日付|ﾊﾟｰﾄNo|Master|2025年|20190821|支持板'
+        self._re_sep = re.compile(r'^[=_-]{10,}$')  # Long horizontal lines
+        # Header filters are bare literal alternations: any group or anchored
+        # branch disables CPython's fast literal scan, so the (rare) matched
+        # lines are classified afterwards instead of via named groups
+        self._re_header = re.compile(header_words)
+        self._re_xy_skip = re.compile(header_words + r'|' + xy_header_words)
+        self._header_words = frozenset(header_words.split('|'))
+        self._re_simple_element = re.compile(r'^([^\s]+)\s+' + element_types)
+        self._re_stats = re.compile(r'S=\s*([\d.]+)\s+Min=\((\d+)\)\s*([-\d.]+)\s+Max=\((\d+)\)\s*([-\d.]+)\s+形状=\s*([\d.]+)')
+        # Named coordinate rows and full element lines in one anchored match,
+        # dispatched on m.lastgroup. The two never overlap: a coordinate row's
+        # second token is a lone X/Y/Z/D, never an element type. The five
+        # numeric fields are captured as one block and parsed in bulk. Stats
+        # stay a separate search so they keep the fast 'S=' literal scan.
+        # The element type only has to prefix the second token ('点' also
+        # matches '点数').
+        self._re_row = re.compile(
+            r'(?P<coord>(?P<coord_name>[XYZ]-値_[^\s]*|\d+)\s+(?P<coord_type>[XYZ]|D)\s+'
+            r'(?P<values>(?:[-\d.]+\s+){4}[-\d.]+)\s*(?P<histogram>.*)?)'
+            r'|(?P<elem>(?P<elem_name>[^\s]+)\s+(?P<elem_type>' + element_type_words + r')'
+            r'\s*.*?点数\s*\((?P<points>\d+)\)\s*(?P<side>内側|外側)?)'
+        )
+        # Layout of the per-row tuples collected by _parse_stream()
+        self._element_fields = ('element_name', 'measurement_type', 'point_count', 'side')
+        self._stats_fields = ('std_dev', 'min_value', 'max_value', 'form_error')
+        self._value_fields = ('measured_value', 'expected_value', 'upper_tolerance', 'lower_tolerance', 'calculated_deviation')
+        self._row_fields = self._element_fields + self._stats_fields + ('coordinate_name', 'coordinate_type', 'value_block', 'histogram')
+        
+        self._re_circle = re.compile(r'^円\d+$')
+        self._re_d = re.compile(r'^ｄ-\d+$')
+        self._re_x = re.compile(r'\bX\s+([-\d.]+)')
+        self._re_y = re.compile(r'\bY\s+([-\d.]+)')
+        
+        # Whole-document XY scan: an accepted element line, then the first X and
+        # the first Y on later lines. Rejected element lines are skipped, element
+        # lines never count as X/Y lines, and a new accepted element restarts the
+        # search, mirroring the line-by-line state machine. [^\S\n] keeps every
+        # match within a single line.
+        ws = r'[^\S\n]+'
+        any_element = r'\S+' + ws + r'(?:' + element_type_words + r')'
+        accepted_element = r'(?:円\d+|ｄ-\d+)' + ws + r'(?:' + element_type_words + r')'
+        
+        def skip_line(axis):
+            return (r'(?:(?=' + any_element + r')(?!' + accepted_element + r')'
+                    r'|(?!' + any_element + r')(?![^\n]*?\b' + axis + ws + r'[-\d.]))[^\n]*\n')
+        
+        def value_line(axis, name):
+            return r'(?!' + any_element + r')[^\n]*?\b' + axis + ws + r'(?P<' + name + r'>[-\d.]+)'
+        
+        xy_head = (
+            r'^(?P<element>円\d+|ｄ-\d+)' + ws + r'(?:' + element_type_words + r')[^\n]*\n'
+            + r'(?:' + skip_line('X') + r')*?' + value_line('X', 'x')
+        )
+        self._re_xy_record = re.compile(
+            xy_head + r'[^\n]*\n' + r'(?:' + skip_line('Y') + r')*?' + value_line('Y', 'y'),
+            re.MULTILINE
+        )
+        self._re_xy_head = re.compile(xy_head, re.MULTILINE)
+        self._re_xy_start = re.compile(accepted_element)
+        
+        # Silent XY parsing buffers clean lines for the scan above, starting at
+        # an accepted element line (earlier lines can never be part of a record).
+        # Past this many lines the buffer is flushed at the next accepted element
+        # line, or drained by _drain_xy_buffer() at any other line, so it never
+        # holds much more than this many lines whatever the report looks like
+        self._xy_chunk_lines = 10000
+        
+    def parse_lines_to_dataframe(self, lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False, dtype_backend: str = 'numpy') -> pd.DataFrame:
         """
         Parse CMM measurement lines into a structured DataFrame using improved parsing logic.
-        
+
         Args:
-            lines: List of strings from CMM measurement data
+            lines: Strings from CMM measurement data (list, open file or any iterable)
             use_japanese_columns: Whether to use Japanese column names (default: True)
             verbose: Whether to print progress messages (default: False)
-        
+            dtype_backend: 'numpy' or 'pyarrow' for Arrow-backed columns (default: 'numpy')
+
         Returns:
             pandas.DataFrame: Structured measurement data with Japanese column names
-        
+
         Example:
             >>> lines = text.split('\\n')  # Your CMM report text
             >>> df = parser.parse_lines_to_dataframe(lines, verbose=True)
             >>> print(f"Parsed {len(df)} measurements")
         """
-        
+
+        self._check_dtype_backend(dtype_backend)
+
         if verbose:
             print("🔧 Parsing CMM measurement data...")
             print("=" * 60)
-        
-        # Step 1: Split into datasets using horizontal separators
-        datasets = []
-        current_dataset = []
-        
-        separator_pattern = r'^[=_-]{10,}$'  # Long horizontal lines
-        header_pattern = r'(CARL ZEISS|CALYPSO|測定ﾌﾟﾗﾝ|ACCURA|名前|説明|実測値|基準値|上許容差|下許容誤差|ﾋｽﾄｸﾞﾗﾑ)'
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Skip page headers
-            if re.search(header_pattern, line):
-                continue
-                
-            # If we hit a separator, save current dataset and start new one
-            if re.search(separator_pattern, line):
-                if current_dataset:
-                    datasets.append(current_dataset)
-                    current_dataset = []
-            else:
-                current_dataset.append(line)
-        
-        # Don't forget the last dataset
-        if current_dataset:
-            datasets.append(current_dataset)
-        
-        if verbose:
-            print(f"📊 Found {len(datasets)} datasets")
-        
-        # Step 2: Process each dataset with improved patterns
-        measurement_records = []
-        
-        for dataset_idx, dataset in enumerate(datasets):
-            if not dataset:  # Skip empty datasets
-                continue
-                
-            # Find element identifier (first line of dataset, more flexible)
-            blue_tag = None
-            element_info = {}
-            stats_info = {}
-            
-            for line_idx, line in enumerate(dataset):
-                # Improved element pattern for actual data
-                element_pattern = r'^([^\s]+)\s+(円\(最小二乗法\)|平面\(最小二乗法\)|直線\(最小二乗法\)|基本座標系|3次元直線|点|2D距離)\s*.*?点数\s*\((\d+)\)\s*(内側|外側)?'
-                element_match = re.search(element_pattern, line)
-                
-                if element_match:
-                    blue_tag = element_match.group(1)
-                    element_info = {
-                        'element_name': blue_tag,
-                        'measurement_type': element_match.group(2),
-                        'point_count': int(element_match.group(3)) if element_match.group(3) else 0,
-                        'side': element_match.group(4) if element_match.group(4) else 'N/A'
-                    }
-                    continue
-                
-                # Flexible element pattern for simple cases
-                if not blue_tag and line_idx == 0:
-                    simple_element_pattern = r'^([^\s]+)\s+(円\(最小二乗法\)|平面\(最小二乗法\)|直線\(最小二乗法\)|基本座標系|3次元直線|点|2D距離)'
-                    simple_match = re.search(simple_element_pattern, line)
-                    if simple_match:
-                        blue_tag = simple_match.group(1)
-                        element_info = {
-                            'element_name': blue_tag,
-                            'measurement_type': simple_match.group(2),
-                            'point_count': 0,
-                            'side': 'N/A'
-                        }
-                        continue
-                
-                # Stats pattern for statistical information
-                stats_pattern = r'S=\s*([\d.]+)\s+Min=\((\d+)\)\s*([-\d.]+)\s+Max=\((\d+)\)\s*([-\d.]+)\s+形状=\s*([\d.]+)'
-                stats_match = re.search(stats_pattern, line)
-                if stats_match:
-                    stats_info = {
-                        'std_dev': float(stats_match.group(1)),
-                        'min_point': int(stats_match.group(2)),
-                        'min_value': float(stats_match.group(3)),
-                        'max_point': int(stats_match.group(4)),
-                        'max_value': float(stats_match.group(5)),
-                        'form_error': float(stats_match.group(6))
-                    }
-                    continue
-                
-                # Coordinate patterns for actual data
-                if blue_tag:  # Only process coordinates if we have an element
-                    
-                    # Named coordinates with full tolerance data (COLORED VALUES)
-                    named_coord_pattern = r'^([XYZ]-値_[^\s]*|Y-値_[^\s]*|X-値_[^\s]*|\d+)\s+([XYZ]|D)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s+([-\d.]+)\s*(.*)?'
-                    named_match = re.search(named_coord_pattern, line)
-                    
-                    if named_match:
-                        record = element_info.copy()
-                        record.update(stats_info)
-                        record.update({
-                            'coordinate_name': named_match.group(1),
-                            'coordinate_type': named_match.group(2),
-                            'measured_value': float(named_match.group(3)),
-                            'expected_value': float(named_match.group(4)),
-                            'upper_tolerance': float(named_match.group(5)),
-                            'lower_tolerance': float(named_match.group(6)),
-                            'calculated_deviation': float(named_match.group(7)),
-                            'histogram': named_match.group(8).strip() if named_match.group(8) else '',
-                            'data_type': 'named_coordinate_with_tolerance',
-                            'has_colored_values': True  # These would be colored in original
-                        })
-                        measurement_records.append(record)
-                        continue
-        
-        if verbose:
-            print(f"\n📊 EXTRACTION SUMMARY:")
-            print(f"✅ Total datasets processed: {len(datasets)}")
-            print(f"✅ Total measurement records: {len(measurement_records)}")
-        
-        if measurement_records:
-            df = pd.DataFrame(measurement_records)
-            
-            # Calculate additional fields
-            df['within_tolerance'] = df.apply(lambda row: 
-                row['lower_tolerance'] <= row['calculated_deviation'] <= row['upper_tolerance'] 
-                if pd.notna(row['lower_tolerance']) and pd.notna(row['upper_tolerance']) and pd.notna(row['calculated_deviation'])
-                else None, axis=1
-            )
-            
-            df['status'] = df['within_tolerance'].map({True: 'PASS', False: 'FAIL', None: 'N/A'})
-            
-            # Add tolerance utilization calculation
-            df['tolerance_range'] = df['upper_tolerance'] - df['lower_tolerance']
-            df['tolerance_utilization'] = np.where(
-                df['tolerance_range'] != 0,
-                (df['calculated_deviation'].abs() / (df['tolerance_range'] / 2) * 100).round(2),
-                0
-            )
-            
-            # Convert to Japanese column names if requested
-            if use_japanese_columns:
-                df = df.rename(columns=self.column_translation)
-                
-                japanese_column_order = [
-                    '要素名', '測定種別', '座標名', '座標種別',
-                    '実測値', '基準値', '偏差',
-                    '上許容差', '下許容差', '許容範囲', '許容範囲内', '許容差使用率', 'ステータス',
-                    'データ種別', 'カラー値有無', '点数', '側面',
-                    '標準偏差', '最小値', '最大値', '形状誤差', 'ヒストグラム'
-                ]
-            else:
-                japanese_column_order = [
-                    'element_name', 'measurement_type', 'coordinate_name', 'coordinate_type',
-                    'measured_value', 'expected_value', 'calculated_deviation',
-                    'upper_tolerance', 'lower_tolerance', 'tolerance_range', 'within_tolerance', 'tolerance_utilization', 'status',
-                    'data_type', 'has_colored_values', 'point_count', 'side',
-                    'std_dev', 'min_value', 'max_value', 'form_error', 'histogram'
-                ]
-            
-            available_columns = [col for col in japanese_column_order if col in df.columns]
-            df = df[available_columns]
-            
-            if verbose:
-                print(f"✅ DataFrame created with {len(df)} records and Japanese column names!")
-            return df
-        else:
-            if verbose:
-                print("❌ No measurement records found")
-            return pd.DataFrame()
 
-    def parse_xy_coordinates(self, lines: List[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
+        measurement_columns, _, dataset_count, _ = self._parse_stream(lines, measurements=True, xy=False, verbose=verbose)
+        return self._build_measurement_dataframe(measurement_columns, dataset_count, use_japanese_columns, verbose, dtype_backend)
+
+    def parse_xy_coordinates(self, lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
         """
         NEW: Parse only X,Y coordinates from specific element types with numerical sorting.
-        
+
         Extracts only exact "円" + numbers and "ｄ-" + numbers elements,
         creating a clean dataset with two rows per element (X and Y coordinates).
-        
+
         Args:
-            lines: List of strings from CMM measurement data
+            lines: Strings from CMM measurement data (list, open file or any iterable)
             use_japanese_columns: Whether to use Japanese column names (default: True)
             verbose: Whether to print progress messages (default: False)
-        
+
         Returns:
             pandas.DataFrame: Clean XY coordinate data with numerical sorting
-        
+
         Example:
             >>> parser = CMMParser()
             >>> df = parser.parse_xy_coordinates(lines, verbose=True)
             >>> print(f"Extracted {len(df)} coordinate records")
         """
-        
+
         if verbose:
             print("🔧 Filtered XY Parser - Continuous stream processing...")
             print("=" * 60)
 
-        # Step 1: Clean the lines by removing headers
-        clean_lines = []
-        header_pattern = r'(CARL ZEISS|CALYPSO|測定ﾌﾟﾗﾝ|ACCURA|名前|説明|実測値|基準値|上許容差|下許容誤差|ﾋｽﾄｸﾞﾗﾑ|ｺﾝﾊﾟｸﾄﾌﾟﾘﾝﾄｱｳﾄ|ｵﾍﾟﾚｰﾀ|日付|ﾊﾟｰﾄNo|Master|2025年|20190821|支持板)'
-        separator_pattern = r'^[=_-]{10,}$'
-        
+        _, xy_records, _, clean_line_count = self._parse_stream(lines, measurements=False, xy=True, verbose=verbose)
+        return self._build_xy_dataframe(xy_records, clean_line_count, use_japanese_columns, verbose)
+
+    def parse_all(self, lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False, dtype_backend: str = 'numpy') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Parse measurements and filtered XY coordinates in a single pass over the lines.
+
+        Equivalent to calling parse_lines_to_dataframe() and parse_xy_coordinates()
+        separately, but the report is only walked once.
+
+        Args:
+            lines: Strings from CMM measurement data (list, open file or any iterable)
+            use_japanese_columns: Whether to use Japanese column names (default: True)
+            verbose: Whether to print progress messages (default: False)
+            dtype_backend: Backend for the measurement DataFrame, 'numpy' or 'pyarrow' (default: 'numpy')
+
+        Returns:
+            Tuple of (measurement_df, xy_df)
+
+        Example:
+            >>> parser = CMMParser()
+            >>> df, xy_df = parser.parse_all(lines)
+        """
+
+        self._check_dtype_backend(dtype_backend)
+
+        if verbose:
+            print("🔧 Parsing CMM measurement and XY data...")
+            print("=" * 60)
+
+        measurement_columns, xy_records, dataset_count, clean_line_count = self._parse_stream(
+            lines, measurements=True, xy=True, verbose=verbose
+        )
+        df = self._build_measurement_dataframe(measurement_columns, dataset_count, use_japanese_columns, verbose, dtype_backend)
+        xy_df = self._build_xy_dataframe(xy_records, clean_line_count, use_japanese_columns, verbose)
+        return df, xy_df
+
+    def parse_file(self, path: str, use_japanese_columns: bool = True, verbose: bool = False, encoding: str = 'utf-8', dtype_backend: str = 'numpy') -> pd.DataFrame:
+        """
+        Parse a CMM report text file, streaming it line by line.
+
+        The file is never read into memory as a whole, so peak memory is bounded
+        by the parsed records rather than the report size.
+
+        Args:
+            path: Path to the extracted CMM report text
+            use_japanese_columns: Whether to use Japanese column names (default: True)
+            verbose: Whether to print progress messages (default: False)
+            encoding: Text encoding of the report, e.g. 'cp932' (default: 'utf-8')
+            dtype_backend: 'numpy' or 'pyarrow' for Arrow-backed columns (default: 'numpy')
+
+        Returns:
+            pandas.DataFrame: Structured measurement data
+
+        Example:
+            >>> parser = CMMParser()
+            >>> df = parser.parse_file('report.txt', encoding='cp932')
+        """
+        with open(path, 'r', encoding=encoding) as f:
+            return self.parse_lines_to_dataframe(f, use_japanese_columns, verbose, dtype_backend)
+
+    def _check_dtype_backend(self, dtype_backend: str) -> None:
+        """
+        Validate a dtype_backend argument before any parsing work is done.
+
+        Args:
+            dtype_backend: 'numpy' or 'pyarrow'
+
+        Raises:
+            ValueError: If the backend name is unknown
+            ImportError: If 'pyarrow' is requested but pyarrow is not installed
+        """
+        if dtype_backend not in ('numpy', 'pyarrow'):
+            raise ValueError(f"dtype_backend must be 'numpy' or 'pyarrow', got {dtype_backend!r}")
+        if dtype_backend == 'pyarrow' and pa is None:
+            raise ImportError("dtype_backend='pyarrow' requires pyarrow: pip install pyarrow")
+
+    def _iter_clean_lines(self, lines: Iterable[str], mark_xy_headers: bool = False, verbose: bool = False) -> Iterator[Tuple[int, str, bool]]:
+        """
+        Stream stripped data lines, dropping blank lines, page headers and separators.
+
+        Args:
+            lines: Iterable of raw strings from CMM measurement data
+            mark_xy_headers: Whether to flag lines matched by the extended XY header filter
+            verbose: Whether to print skipped header lines (default: False)
+
+        Yields:
+            Tuple of (dataset_idx, line, is_xy_header). dataset_idx advances at every
+            separator that closes a non-empty dataset.
+        """
+        strip = str.strip
+        search_header = self._re_header.search
+        search_skip = self._re_xy_skip.search if mark_xy_headers else search_header
+        match_sep = self._re_sep.match
+        header_words = self._header_words
+
+        dataset_idx = 0
+        in_dataset = False
+
         for line in lines:
-            line = line.strip()
+            line = strip(line)
             if not line:
                 continue
-            # Skip all header/separator lines
-            if re.search(header_pattern, line) or re.search(separator_pattern, line):
+
+            is_xy_header = False
+            skip_match = search_skip(line)
+            if skip_match:
                 if verbose:
                     print(f"   Skipping header: {line[:50]}...")
+
+                # Skip page headers. The match is leftmost, so a base header
+                # can only start after an XY-only word found first.
+                if skip_match.group() in header_words or search_header(line, skip_match.start() + 1):
+                    continue
+
+                # XY-only header: still data for the measurement parser
+                is_xy_header = True
+
+            # A separator closes the current dataset
+            elif line[0] in '=_-' and match_sep(line):
+                if verbose:
+                    print(f"   Skipping header: {line[:50]}...")
+                if in_dataset:
+                    dataset_idx += 1
+                    in_dataset = False
                 continue
-            clean_lines.append(line)
 
-        if verbose:
-            print(f"📊 Cleaned document: {len(clean_lines)} useful lines")
+            in_dataset = True
+            yield dataset_idx, line, is_xy_header
+
+    def _parse_stream(self, lines: Iterable[str], measurements: bool = True, xy: bool = True, verbose: bool = False) -> Tuple[Dict[str, List], List[Dict], int, int]:
+        """
+        Run the measurement and filtered XY state machines over one pass of the lines.
+
+        Args:
+            lines: Iterable of raw strings from CMM measurement data
+            measurements: Whether to collect measurement records
+            xy: Whether to collect filtered XY records
+            verbose: Whether to print progress messages (default: False)
+
+        Returns:
+            Tuple of (measurement_columns, xy_records, dataset_count, clean_line_count).
+            measurement_columns maps each field name to its column values.
+        """
+        rows = []
+        xy_lines = []
+        stats_seen = False
+        xy_records = []
+        dataset_count = 0
+        clean_line_count = 0
+
+        match_row = self._re_row.match
+        search_simple_element = self._re_simple_element.search
+        search_stats = self._re_stats.search
+
+        append_row = rows.append
+        append_xy_line = xy_lines.append
+        match_xy_start = self._re_xy_start.match
+
+        # XY extraction is specialised once per call rather than per line. The
+        # verbose trace reads the whole run at once so its line numbers and
+        # incomplete-element warnings stay continuous.
+        extract_xy = self._trace_xy_records if verbose else self._scan_xy_records
+        xy_chunk_lines = float('inf') if verbose else self._xy_chunk_lines
+        # The verbose trace sees every line; silent parsing starts buffering at
+        # the first accepted element line
+        xy_pending = verbose
+        no_stats = (np.nan,) * len(self._stats_fields)
+
+        # Measurement state, reset at every dataset boundary.
+        # element_info and stats_info are tuples laid out as in self._row_fields.
+        current_dataset_idx = None
+        line_idx = 0
+        blue_tag = None
+        element_info = ()
+        stats_info = no_stats
+
+        for dataset_idx, line, is_xy_header in self._iter_clean_lines(lines, mark_xy_headers=xy, verbose=verbose and xy):
+
+            if measurements:
+                if dataset_idx != current_dataset_idx:
+                    current_dataset_idx = dataset_idx
+                    dataset_count += 1
+                    line_idx = 0
+                    blue_tag = None
+                    element_info = ()
+                    stats_info = no_stats
+                else:
+                    line_idx += 1
+
+                # Element line or named coordinate row, in a single match
+                row_match = match_row(line)
+                kind = row_match.lastgroup if row_match else None
+
+                # A stats block anywhere on the line still outranks a coordinate row
+                if kind == 'coord' and 'S=' in line and search_stats(line):
+                    kind = 'stats'
+
+                if kind == 'elem':
+                    blue_tag, measurement_type, point_count, side = row_match.group('elem_name', 'elem_type', 'points', 'side')
+                    element_info = (blue_tag, measurement_type, int(point_count) if point_count else 0, side or 'N/A')
+
+                # Named coordinates with full tolerance data (COLORED VALUES), only once we have an element
+                elif kind == 'coord':
+                    if blue_tag:
+                        coordinate_name, coordinate_type, value_block, histogram = row_match.group(
+                            'coord_name', 'coord_type', 'values', 'histogram'
+                        )
+                        append_row((
+                            *element_info, *stats_info,
+                            coordinate_name, coordinate_type, value_block,
+                            histogram.strip() if histogram else ''
+                        ))
+                        
+                        # Datasets without a stats line leave these fields empty (NaN)
+                        if stats_info is not no_stats:
+                            stats_seen = True
+
+                else:
+                    # Flexible element pattern for simple cases
+                    simple_match = None
+                    if not kind and not blue_tag and line_idx == 0:
+                        simple_match = search_simple_element(line)
+
+                    if simple_match:
+                        blue_tag = simple_match.group(1)
+                        element_info = (blue_tag, simple_match.group(2), 0, 'N/A')
+                    else:
+                        # Stats pattern for statistical information
+                        stats_match = search_stats(line)
+                        if stats_match:
+                            # Min/Max point numbers are not part of the output
+                            std_dev, _, min_value, _, max_value, form_error = stats_match.groups()
+                            stats_info = (float(std_dev), float(min_value), float(max_value), float(form_error))
+
+            if not xy or is_xy_header:
+                continue
+
+            clean_line_count += 1
+            if not xy_pending:
+                # Outside any candidate record only an accepted element line matters
+                if not match_xy_start(line):
+                    continue
+                xy_pending = True
+            elif len(xy_lines) >= xy_chunk_lines:
+                if match_xy_start(line):
+                    xy_records.extend(extract_xy(xy_lines))
+                    xy_lines.clear()
+                else:
+                    drained_records, remaining_lines = self._drain_xy_buffer(xy_lines)
+                    xy_records.extend(drained_records)
+                    xy_lines[:] = remaining_lines
+                    if not remaining_lines:
+                        xy_pending = False
+                        continue
+            append_xy_line(line)
+
+        # The verbose trace runs here, after the stream, so the count is known
+        if verbose and xy:
+            print(f"📊 Cleaned document: {clean_line_count} useful lines")
+
+        if xy_lines:
+            xy_records.extend(extract_xy(xy_lines))
+
+        # Transpose the row tuples into one column per field
+        if rows:
+            measurement_columns = dict(zip(self._row_fields, zip(*rows)))
+        else:
+            measurement_columns = {name: () for name in self._row_fields}
+        value_blocks = measurement_columns.pop('value_block')
+
+        # Parse every numeric block in one C-level pass instead of five float() calls per row.
+        # The row pattern's \s and \d are Unicode, so split on any whitespace first
+        # (full-width spaces included) and let float() take what the C parser rejects,
+        # such as full-width digits; float() also raises on malformed values as before
+        row_count = len(value_blocks)
+        tokens = ' '.join(value_blocks).split()
+        values = None
+        if tokens:
+            try:
+                with warnings.catch_warnings():
+                    # Older numpy returns a short array with a DeprecationWarning instead of raising
+                    warnings.simplefilter('ignore', DeprecationWarning)
+                    values = np.fromstring(' '.join(tokens), dtype=np.float64, sep=' ')
+            except ValueError:
+                values = None
+        if values is None or values.size != len(tokens):
+            values = np.array([float(token) for token in tokens], dtype=np.float64)
+        values = values.reshape(row_count, len(self._value_fields))
+        for i, name in enumerate(self._value_fields):
+            measurement_columns[name] = values[:, i]
+
+        # Match the old list-of-dicts behaviour: no stats anywhere means no stats columns
+        if not stats_seen:
+            for name in self._stats_fields:
+                del measurement_columns[name]
 
-        # Step 2: Process all clean lines sequentially
+        return measurement_columns, xy_records, dataset_count, clean_line_count
+
+    def _scan_xy_records(self, xy_lines: List[str]) -> List[Dict]:
+        """
+        Extract filtered XY records from a run of clean lines with one regex scan.
+
+        Args:
+            xy_lines: Clean lines, starting at an accepted element line or the report start
+
+        Returns:
+            List of XY record dicts in document order
+        """
+        return [
+            {
+                'element_name': m.group('element'),
+                'x_coordinate': abs(float(m.group('x'))),
+                'y_coordinate': abs(float(m.group('y')))
+            }
+            for m in self._re_xy_record.finditer('\n'.join(xy_lines))
+        ]
+
+    def _drain_xy_buffer(self, xy_lines: List[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        Extract every record already decided in a silent XY buffer and shrink the rest.
+
+        Records never span an accepted element line, so everything before the last
+        one is scanned now. Of the element still pending, only its own line and its
+        X line are kept: every other line after it is one the record pattern skips,
+        so dropping them cannot change the result.
+
+        Args:
+            xy_lines: Buffered clean lines, starting at an accepted element line
+
+        Returns:
+            Tuple of (records, remaining_lines). remaining_lines is empty when the
+            last element's record is complete, so nothing needs buffering until the
+            next accepted element line.
+        """
+        match_xy_start = self._re_xy_start.match
+        last_start = len(xy_lines) - 1
+        while not match_xy_start(xy_lines[last_start]):
+            last_start -= 1
+
+        records = self._scan_xy_records(xy_lines[:last_start])
+        tail = xy_lines[last_start:]
+        tail_records = self._scan_xy_records(tail)
+        if tail_records:
+            return records + tail_records, []
+
+        tail_text = '\n'.join(tail)
+        head_match = self._re_xy_head.match(tail_text)
+        if head_match:
+            # Element line plus the line holding its X value
+            return records, [tail[0], tail[tail_text.count('\n', 0, head_match.end())]]
+        return records, [tail[0]]
+
+    def _trace_xy_records(self, xy_lines: List[str]) -> List[Dict]:
+        """
+        Extract filtered XY records line by line, printing every decision.
+
+        Verbose counterpart of _scan_xy_records(): same records, driven by an
+        explicit state machine so each candidate, rejection and coordinate is reported.
+
+        Args:
+            xy_lines: Clean lines, starting at an accepted element line or the report start
+
+        Returns:
+            List of XY record dicts in document order
+        """
         xy_records = []
+        search_simple_element = self._re_simple_element.search
+        match_circle = self._re_circle.match
+        match_d = self._re_d.match
+        search_x = self._re_x.search
+        search_y = self._re_y.search
+
         current_element = None
         looking_for_x = False
         looking_for_y = False
         current_x = None
 
-        for line_idx, line in enumerate(clean_lines):
-            
+        for line_idx, line in enumerate(xy_lines):
+
             # Look for element patterns
-            element_pattern = r'^([^\s]+)\s+(円\(最小二乗法\)|平面\(最小二乗法\)|直線\(最小二乗法\)|基本座標系|3次元直線|点|2D距離)'
-            element_match = re.search(element_pattern, line)
-            
+            element_match = search_simple_element(line)
+
             if element_match:
                 candidate_tag = element_match.group(1)
-                
-                if verbose:
-                    print(f"   Line {line_idx}: Found candidate element '{candidate_tag}'")
-                
+
+                print(f"   Line {line_idx}: Found candidate element '{candidate_tag}'")
+
                 # FILTER: Only EXACT matches for "円" + numbers OR "ｄ-" + numbers
-                circle_pattern = r'^円\d+$'
-                d_pattern = r'^ｄ-\d+$'
-                
-                if re.search(circle_pattern, candidate_tag) or re.search(d_pattern, candidate_tag):
+                if match_circle(candidate_tag) or match_d(candidate_tag):
                     # Save previous record if incomplete
                     if current_element and current_x is not None and looking_for_y:
-                        if verbose:
-                            print(f"   ⚠️  Previous element {current_element} incomplete (missing Y)")
-                    
+                        print(f"   ⚠️  Previous element {current_element} incomplete (missing Y)")
+
                     # Start tracking new element
                     current_element = candidate_tag
                     looking_for_x = True
                     looking_for_y = False
                     current_x = None
-                    
-                    if verbose:
-                        tag_type = "円グループ" if "円" in candidate_tag else "ｄ-グループ"
-                        print(f"   ✅ ACCEPTED element: {current_element} ({tag_type})")
+
+                    tag_type = "円グループ" if "円" in candidate_tag else "ｄ-グループ"
+                    print(f"   ✅ ACCEPTED element: {current_element} ({tag_type})")
                 else:
-                    if verbose:
-                        print(f"   ❌ REJECTED element: {candidate_tag} (doesn't match filter)")
-                continue
+                    print(f"   ❌ REJECTED element: {candidate_tag} (doesn't match filter)")
 
             # Look for X coordinate
-            if current_element and looking_for_x:
-                x_pattern = r'\bX\s+([-\d.]+)'
-                x_match = re.search(x_pattern, line)
+            elif current_element and looking_for_x:
+                x_match = search_x(line)
                 if x_match:
                     current_x = abs(float(x_match.group(1)))
                     looking_for_x = False
                     looking_for_y = True
-                    if verbose:
-                        print(f"   ✅ Found X for {current_element}: {current_x}")
-                    continue
+                    print(f"   ✅ Found X for {current_element}: {current_x}")
 
             # Look for Y coordinate
-            if current_element and current_x is not None and looking_for_y:
-                y_pattern = r'\bY\s+([-\d.]+)'
-                y_match = re.search(y_pattern, line)
+            elif current_element and current_x is not None and looking_for_y:
+                y_match = search_y(line)
                 if y_match:
                     current_y = abs(float(y_match.group(1)))
-                    
+
                     # Save complete record
                     record = {
                         'element_name': current_element,
@@ -368,20 +647,124 @@ class CMMParser:
                         'y_coordinate': current_y
                     }
                     xy_records.append(record)
-                    
-                    if verbose:
-                        print(f"   ✅ COMPLETE: {current_element} X={current_x} Y={current_y}")
-                    
+
+                    print(f"   ✅ COMPLETE: {current_element} X={current_x} Y={current_y}")
+
                     # Reset for next element
                     current_element = None
                     looking_for_x = False
                     looking_for_y = False
                     current_x = None
-                    continue
+
+        return xy_records
+
+    def _build_measurement_dataframe(self, measurement_columns: Dict[str, List], dataset_count: int, use_japanese_columns: bool = True, verbose: bool = False, dtype_backend: str = 'numpy') -> pd.DataFrame:
+        """
+        Build the measurement DataFrame with tolerance analysis from parsed records.
+
+        Args:
+            measurement_columns: Column lists collected by _parse_stream()
+            dataset_count: Number of datasets seen while parsing
+            use_japanese_columns: Whether to use Japanese column names (default: True)
+            verbose: Whether to print progress messages (default: False)
+            dtype_backend: 'numpy' or 'pyarrow' (checked by _check_dtype_backend())
+
+        Returns:
+            pandas.DataFrame: Structured measurement data
+        """
+
+        record_count = len(measurement_columns['element_name'])
+        
+        if verbose:
+            print(f"📊 Found {dataset_count} datasets")
+            print(f"\n📊 EXTRACTION SUMMARY:")
+            print(f"✅ Total datasets processed: {dataset_count}")
+            print(f"✅ Total measurement records: {record_count}")
+
+        if record_count:
+            columns = dict(measurement_columns)
+            
+            # Calculate additional fields on the parsed arrays, before any frame exists
+            lower = columns['lower_tolerance']
+            upper = columns['upper_tolerance']
+            deviation = columns['calculated_deviation']
+            valid = ~(np.isnan(lower) | np.isnan(upper) | np.isnan(deviation))
+            within = (lower <= deviation) & (deviation <= upper)
+            
+            # Keep a plain bool column unless some rows lack tolerance data (None)
+            columns['within_tolerance'] = within if valid.all() else np.where(valid, within, None)
+            columns['status'] = np.select([valid & within, valid], ['PASS', 'FAIL'], default='N/A')
+            
+            # Add tolerance utilization calculation
+            tolerance_range = upper - lower
+            columns['tolerance_range'] = tolerance_range
+            
+            # Only divide where there is a tolerance band; zero-width bands report 0
+            utilization = np.zeros_like(tolerance_range)
+            np.divide(np.abs(deviation), tolerance_range / 2, out=utilization, where=tolerance_range != 0)
+            columns['tolerance_utilization'] = np.round(utilization * 100, 2)
+            
+            columns['data_type'] = 'named_coordinate_with_tolerance'
+            columns['has_colored_values'] = True  # These would be colored in original
+            
+            column_order = [
+                'element_name', 'measurement_type', 'coordinate_name', 'coordinate_type',
+                'measured_value', 'expected_value', 'calculated_deviation',
+                'upper_tolerance', 'lower_tolerance', 'tolerance_range', 'within_tolerance', 'tolerance_utilization', 'status',
+                'data_type', 'has_colored_values', 'point_count', 'side',
+                'std_dev', 'min_value', 'max_value', 'form_error', 'histogram'
+            ]
+            
+            # Low-cardinality labels: store as integer codes plus a small category table
+            category_columns = ('element_name', 'measurement_type', 'coordinate_type', 'side', 'data_type')
+            
+            # Convert to Japanese column names if requested
+            names = self.column_translation if use_japanese_columns else {}
+            available_columns = [col for col in column_order if col in columns]
+            
+            if dtype_backend == 'pyarrow':
+                # Arrow columns straight from the arrays; labels become dictionary arrays
+                arrays = {}
+                for col in available_columns:
+                    values = columns[col]
+                    if np.ndim(values) == 0:
+                        array = pa.repeat(values, record_count)
+                    else:
+                        array = pa.array(values, from_pandas=True)  # NaN -> null
+                    if col in category_columns:
+                        array = array.dictionary_encode()
+                    arrays[names.get(col, col)] = array
+                df = pa.table(arrays).to_pandas(types_mapper=pd.ArrowDtype)
+            else:
+                df = pd.DataFrame({names.get(col, col): columns[col] for col in available_columns})
+                for col in category_columns:
+                    df[names.get(col, col)] = df[names.get(col, col)].astype('category')
+            
+            if verbose:
+                print(f"✅ DataFrame created with {len(df)} records and Japanese column names!")
+            return df
+        else:
+            if verbose:
+                print("❌ No measurement records found")
+            return pd.DataFrame()
+
+    def _build_xy_dataframe(self, xy_records: List[Dict], clean_line_count: int, use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
+        """
+        Build the reshaped, numerically sorted XY DataFrame from parsed records.
+
+        Args:
+            xy_records: Records collected by _parse_stream()
+            clean_line_count: Number of clean lines scanned for XY data
+            use_japanese_columns: Whether to use Japanese column names (default: True)
+            verbose: Whether to print progress messages (default: False)
+
+        Returns:
+            pandas.DataFrame: Clean XY coordinate data with numerical sorting
+        """
 
         if verbose:
             print(f"\n📊 FILTERED XY EXTRACTION SUMMARY:")
-            print(f"✅ Total clean lines processed: {len(clean_lines)}")
+            print(f"✅ Total clean lines processed: {clean_line_count}")
             print(f"✅ Total filtered XY records: {len(xy_records)}")
 
         if xy_records:
@@ -394,52 +777,22 @@ class CMMParser:
                 print(f"   円グループ: {len(circle_elements)} elements")
                 print(f"   ｄ-グループ: {len(d_elements)} elements")
 
-            # NUMERICAL SORTING FUNCTION
-            def extract_number(element_name):
-                if "円" in element_name:
-                    match = re.search(r'円(\d+)', element_name)
-                    return int(match.group(1)) if match else 0
-                elif "ｄ-" in element_name:
-                    match = re.search(r'ｄ-(\d+)', element_name)
-                    return int(match.group(1)) if match else 0
-                return 0
-
-            # Create reshaped data with numerical sorting
-            reshaped_data = []
-            
-            # Add 円 group elements (sorted numerically)
-            circle_elements_sorted = sorted(circle_elements, key=lambda x: extract_number(x['element_name']))
-            for element_record in circle_elements_sorted:
-                # Add X row
-                reshaped_data.append({
-                    'element_name': element_record['element_name'],
-                    'coordinate_type': 'X',
-                    'value': element_record['x_coordinate']
-                })
-                # Add Y row
-                reshaped_data.append({
-                    'element_name': element_record['element_name'],
-                    'coordinate_type': 'Y',
-                    'value': element_record['y_coordinate']
-                })
+            # Wide frame of the 円 group then the ｄ- group, each sorted numerically
+            grouped_elements = circle_elements + d_elements
+            df_wide = pd.DataFrame(grouped_elements, columns=['element_name', 'x_coordinate', 'y_coordinate'])
+            df_wide['_group'] = np.repeat([0, 1], [len(circle_elements), len(d_elements)])
+            df_wide['_number'] = [_extract_element_number(r['element_name']) for r in grouped_elements]
+            df_wide = df_wide.sort_values(['_group', '_number'], kind='stable', ignore_index=True)
             
-            # Add ｄ- group elements (sorted numerically)
-            d_elements_sorted = sorted(d_elements, key=lambda x: extract_number(x['element_name']))
-            for element_record in d_elements_sorted:
-                # Add X row
-                reshaped_data.append({
-                    'element_name': element_record['element_name'],
-                    'coordinate_type': 'X',
-                    'value': element_record['x_coordinate']
-                })
-                # Add Y row
-                reshaped_data.append({
-                    'element_name': element_record['element_name'],
-                    'coordinate_type': 'Y',
-                    'value': element_record['y_coordinate']
-                })
+            # Reshape to one X row and one Y row per element
+            df = df_wide.rename(columns={'x_coordinate': 'X', 'y_coordinate': 'Y'}).melt(
+                id_vars='element_name', value_vars=['X', 'Y'],
+                var_name='coordinate_type', value_name='value'
+            )
             
-            df = pd.DataFrame(reshaped_data)
+            # melt stacks all X rows before all Y rows; interleave them back per element
+            element_count = len(df_wide)
+            df = df.take(np.arange(2 * element_count).reshape(2, element_count).T.ravel()).reset_index(drop=True)
             
             # Convert column names if Japanese requested
             if use_japanese_columns:
@@ -471,17 +824,19 @@ class CMMParser:
         if len(df) == 0:
             return pd.DataFrame()
         
-        # Handle both Japanese and English column names
-        element_col = '要素名' if '要素名' in df.columns else 'element_name'
-        measured_col = '実測値' if '実測値' in df.columns else 'measured_value'
-        deviation_col = '偏差' if '偏差' in df.columns else 'calculated_deviation'
-        tolerance_col = '許容範囲内' if '許容範囲内' in df.columns else 'within_tolerance'
-        util_col = '許容差使用率' if '許容差使用率' in df.columns else 'tolerance_utilization'
-        type_col = '測定種別' if '測定種別' in df.columns else 'measurement_type'
-        point_col = '点数' if '点数' in df.columns else 'point_count'
-        side_col = '側面' if '側面' in df.columns else 'side'
+        # Handle both Japanese and English column names, detected once per frame
+        names = self.column_translation if self.column_translation['element_name'] in df.columns else {}
+        element_col = names.get('element_name', 'element_name')
+        measured_col = names.get('measured_value', 'measured_value')
+        deviation_col = names.get('calculated_deviation', 'calculated_deviation')
+        tolerance_col = names.get('within_tolerance', 'within_tolerance')
+        util_col = names.get('tolerance_utilization', 'tolerance_utilization')
+        type_col = names.get('measurement_type', 'measurement_type')
+        point_col = names.get('point_count', 'point_count')
+        side_col = names.get('side', 'side')
         
-        summary = df.groupby(element_col).agg({
+        # Element names are categorical, so only observed groups are aggregated
+        summary = df.groupby(element_col, observed=True, sort=True).agg({
             type_col: 'first',
             point_col: 'first',
             side_col: 'first',
@@ -508,14 +863,15 @@ class CMMParser:
         return summary.reset_index()
 
 
-def parse_cmm_data(lines: List[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
+def parse_cmm_data(lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False, dtype_backend: str = 'numpy') -> pd.DataFrame:
     """
     Quick function to parse CMM measurement lines to DataFrame.
     
     Args:
-        lines: List of strings from CMM measurement data
+        lines: Strings from CMM measurement data (list, open file or any iterable)
         use_japanese_columns: Whether to use Japanese column names
         verbose: Whether to print progress messages (default: False)
+        dtype_backend: 'numpy' or 'pyarrow' for Arrow-backed columns (default: 'numpy')
         
     Returns:
         pandas.DataFrame: Structured measurement data
@@ -527,10 +883,10 @@ def parse_cmm_data(lines: List[str], use_japanese_columns: bool = True, verbose:
         >>> df = cmp.parse_cmm_data(lines, verbose=True)  # With output
     """
     parser = CMMParser()
-    return parser.parse_lines_to_dataframe(lines, use_japanese_columns, verbose)
+    return parser.parse_lines_to_dataframe(lines, use_japanese_columns, verbose, dtype_backend)
 
 
-def parse_xy_coordinates(lines: List[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
+def parse_xy_coordinates(lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False) -> pd.DataFrame:
     """
     NEW: Quick function to parse only X,Y coordinates from specific elements.
     
@@ -538,7 +894,7 @@ def parse_xy_coordinates(lines: List[str], use_japanese_columns: bool = True, ve
     creating a clean dataset with numerical sorting.
     
     Args:
-        lines: List of strings from CMM measurement data
+        lines: Strings from CMM measurement data (list, open file or any iterable)
         use_japanese_columns: Whether to use Japanese column names (default: True)
         verbose: Whether to print progress messages (default: False)
         
@@ -554,14 +910,15 @@ def parse_xy_coordinates(lines: List[str], use_japanese_columns: bool = True, ve
     return parser.parse_xy_coordinates(lines, use_japanese_columns, verbose)
 
 
-def process_cmm_data(lines: List[str], use_japanese_columns: bool = True, verbose: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def process_cmm_data(lines: Iterable[str], use_japanese_columns: bool = True, verbose: bool = False, dtype_backend: str = 'numpy') -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Complete CMM data processing pipeline.
     
     Args:
-        lines: List of strings from CMM measurement data
+        lines: Strings from CMM measurement data (list, open file or any iterable)
         use_japanese_columns: Whether to use Japanese column names
         verbose: Whether to print progress messages (default: False)
+        dtype_backend: 'numpy' or 'pyarrow' for Arrow-backed columns (default: 'numpy')
         
     Returns:
         Tuple of (detailed_df, summary_df)
@@ -572,7 +929,7 @@ def process_cmm_data(lines: List[str], use_japanese_columns: bool = True, verbos
         >>> print(f"Processed {len(df)} measurements from {len(summary)} elements")
     """
     parser = CMMParser()
-    df = parser.parse_lines_to_dataframe(lines, use_japanese_columns, verbose)
+    df = parser.parse_lines_to_dataframe(lines, use_japanese_columns, verbose, dtype_backend)
     
     if len(df) == 0:
         if verbose:
@@ -586,7 +943,7 @@ def process_cmm_data(lines: List[str], use_japanese_columns: bool = True, verbos
         status_col = 'ステータス' if use_japanese_columns else 'status'
         element_col = '要素名' if use_japanese_columns else 'element_name'
         
-        pass_count = len(df[df[status_col] == 'PASS'])
+        pass_count = int((df[status_col] == 'PASS').sum())
         total_count = len(df)
         pass_rate = (pass_count / total_count * 100) if total_count > 0 else 0
         
@@ -612,12 +969,98 @@ def export_to_excel(df: pd.DataFrame, filename: str = 'CMM_Analysis', verbose: b
     """
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
     excel_filename = f"{filename}_{timestamp}.xlsx"
-    df.to_excel(excel_filename, index=False)
+    _write_excel_rows(df, excel_filename)
     if verbose:
         print(f"✅ Exported: {excel_filename}")
     return excel_filename
 
 
+def _excel_cell(value):
+    """Map one cell to what df.to_excel writes: missing -> empty, inf -> 'inf'/'-inf'."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value in (np.inf, -np.inf):
+            return 'inf' if value > 0 else '-inf'
+    return value
+
+
+def _write_excel_rows(df: pd.DataFrame, excel_filename: str, chunk_rows: int = 10000) -> None:
+    """
+    Write a DataFrame to a single-sheet workbook one row at a time.
+
+    Rows are streamed with xlsxwriter in constant_memory mode when it is installed,
+    otherwise with an openpyxl write-only workbook. Rows are taken from the frame
+    in slices of chunk_rows, since itertuples() turns whole string and category
+    columns into Python lists; only one slice is ever converted to Python values,
+    so beyond the DataFrame itself memory stays bounded (apart from the shared
+    strings table both writers keep). df.to_excel cannot be used here: it writes
+    column by column, which constant_memory cannot accept.
+
+    The output follows df.to_excel(index=False) defaults: a bold, bordered header
+    on 'Sheet1', empty cells for missing values, inf written as 'inf'/'-inf', and
+    datetimes written with a date number format rather than as bare serials
+    ('yyyy-mm-dd hh:mm:ss' with xlsxwriter, where plain dates use it too;
+    openpyxl's own date and datetime defaults otherwise).
+
+    Args:
+        df: DataFrame to export
+        excel_filename: Path of the .xlsx file to create
+        chunk_rows: Rows converted to Python values at a time (default: 10000)
+    """
+    header = [str(col) for col in df.columns]
+
+    # Integer and bool columns can never hold a missing or inf value
+    clean_positions = [
+        i for i, dtype in enumerate(df.dtypes)
+        if not (isinstance(dtype, np.dtype) and dtype.kind in 'biu')
+    ]
+
+    def rows():
+        for start in range(0, len(df), chunk_rows):
+            for row in df.iloc[start:start + chunk_rows].itertuples(index=False, name=None):
+                if clean_positions:
+                    row = list(row)
+                    for i in clean_positions:
+                        row[i] = _excel_cell(row[i])
+                yield row
+
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(excel_filename, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        worksheet = workbook.add_worksheet('Sheet1')
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        worksheet.write_row(0, 0, header, header_format)
+        for row_idx, row in enumerate(rows(), start=1):
+            worksheet.write_row(row_idx, 0, row)
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    # Write-only cells take openpyxl's default datetime format on append
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sheet1')
+    thin = Side(style='thin')
+    header_cells = []
+    for name in header:
+        cell = WriteOnlyCell(worksheet, value=name)
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal='center', vertical='top')
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+    for row in rows():
+        worksheet.append(row)
+    workbook.save(excel_filename)
+
+
 # Package metadata
 __version__ = "1.2.0"  # Updated version
 __author__ = "shuhei"
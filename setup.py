@@ -18,6 +18,10 @@ setup(
         "numpy>=1.18.0",
         "openpyxl>=3.0.0",
     ],
+    extras_require={
+        "arrow": ["pandas>=2.0.0", "pyarrow>=7.0.0"],
+        "xlsxwriter": ["xlsxwriter>=1.2.0"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,266 @@
+"""
+Tests for CMMParser.
+
+The XY checks compare the two extraction paths: silent parsing scans buffered
+lines with one generated regex (_scan_xy_records), while verbose parsing walks
+the original line-by-line state machine (_trace_xy_records). Both must return
+the same records, with or without chunked flushing of the line buffer.
+"""
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import cmm_measurement_parser
+from cmm_measurement_parser import CMMParser
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+# Clean-line shapes that exercise the extraction rules: accepted and rejected
+# element lines, X/Y value lines, element lines carrying X/Y, and noise
+PIECES = [
+    '円1 円(最小二乗法) 点数 (3)', 'ｄ-2 点', '円3_a 平面(最小二乗法) X 5', '平面 平面(最小二乗法)',
+    'X 1.5', 'Y -2.5', 'foo X 3.0 Y 4.0', 'X-値_円1 X 10.0 10 0.1 -0.1 0', 'Y-値_円1 Y 7.0 7 0.1 -0.1 0',
+    'xX 9', 'X　-8.25', 'XX 1', '円12 2D距離', 'Y', 'X', 'ｄ-7', 'ｄ-7  基本座標系 Y 3', 'abc',
+    'X 1 Y 2', 'Y 5 X 6', '円9 点 X 1', '12 D 1 2 3 4 5', '円 点', 'ｄ-01 3次元直線',
+]
+
+# Raw-report extras handled before XY extraction: separators, headers, blanks
+RAW_PIECES = PIECES + ['----------', 'CALYPSO', '日付 X 3', '   ', '']
+
+
+def random_lines(rng, pieces, max_lines=25):
+    return [rng.choice(pieces) for _ in range(rng.randint(0, max_lines))]
+
+
+def trace(method, *args, **kwargs):
+    """Call a verbose method with its progress output discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return method(*args, **kwargs)
+
+
+def xy_stream(parser, lines, verbose=False):
+    """XY records and clean line count from one XY-only pass."""
+    _, xy_records, _, clean_line_count = trace(
+        parser._parse_stream, lines, measurements=False, xy=True, verbose=verbose
+    )
+    return xy_records, clean_line_count
+
+
+class TestXYExtractionEquivalence(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = CMMParser()
+
+    def test_scan_matches_trace(self):
+        rng = random.Random(0)
+        for _ in range(3000):
+            lines = random_lines(rng, PIECES)
+            expected = trace(self.parser._trace_xy_records, lines)
+            self.assertEqual(self.parser._scan_xy_records(lines), expected, lines)
+
+    def test_silent_stream_matches_verbose_stream(self):
+        rng = random.Random(1)
+        for _ in range(2000):
+            lines = random_lines(rng, RAW_PIECES)
+            self.assertEqual(xy_stream(self.parser, lines), xy_stream(self.parser, lines, verbose=True), lines)
+
+    def test_small_chunks_match_verbose_stream(self):
+        rng = random.Random(2)
+        for _ in range(2000):
+            lines = random_lines(rng, RAW_PIECES)
+            self.parser._xy_chunk_lines = rng.randint(1, 3)
+            self.assertEqual(xy_stream(self.parser, lines), xy_stream(self.parser, lines, verbose=True), lines)
+
+    def test_default_chunk_boundary(self):
+        # Long enough to flush several times at the default _xy_chunk_lines
+        rng = random.Random(3)
+        lines = [rng.choice(RAW_PIECES) for _ in range(3 * self.parser._xy_chunk_lines + 1234)]
+        with mock.patch.object(self.parser, '_scan_xy_records', wraps=self.parser._scan_xy_records) as scan:
+            chunked = xy_stream(self.parser, lines)
+
+        unchunked_parser = CMMParser()
+        unchunked_parser._xy_chunk_lines = float('inf')
+        unchunked = xy_stream(unchunked_parser, lines)
+        verbose = xy_stream(self.parser, lines, verbose=True)
+
+        self.assertGreater(scan.call_count, 1)
+        self.assertTrue(chunked[0])
+        self.assertEqual(chunked, unchunked)
+        self.assertEqual(chunked, verbose)
+
+    def test_drained_buffer_keeps_pending_record(self):
+        # X and Y far apart, so the buffer is drained while the element is pending
+        filler = ['abc', 'XX 1', '平面 平面(最小二乗法)', 'Y', 'CALYPSO'] * (self.parser._xy_chunk_lines // 2)
+        lines = ['ｄ-5 点'] + filler + ['X -1.25'] + filler + ['Y 2.5'] + filler + ['円3 点', 'X 4', 'Y 5']
+        with mock.patch.object(self.parser, '_drain_xy_buffer', wraps=self.parser._drain_xy_buffer) as drain:
+            chunked = xy_stream(self.parser, lines)
+
+        self.assertGreater(drain.call_count, 1)
+        self.assertEqual(chunked[0], [
+            {'element_name': 'ｄ-5', 'x_coordinate': 1.25, 'y_coordinate': 2.5},
+            {'element_name': '円3', 'x_coordinate': 4.0, 'y_coordinate': 5.0},
+        ])
+        self.assertEqual(chunked, xy_stream(self.parser, lines, verbose=True))
+
+
+class TestMeasurementParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = CMMParser()
+
+    def test_unicode_whitespace_and_digits_in_coordinate_rows(self):
+        lines = [
+            '円1 円(最小二乗法) 点数 (3)',
+            'X-値_円1 X\u300010.0\u300010 0.1 -0.1 0.02',
+            'Y-値_円1 Y 7.0 ７ 0.1\u00a0-0.1 -0.2',
+        ]
+        df = self.parser.parse_lines_to_dataframe(lines, use_japanese_columns=False)
+        self.assertEqual(df['measured_value'].tolist(), [10.0, 7.0])
+        self.assertEqual(df['expected_value'].tolist(), [10.0, 7.0])
+        self.assertEqual(df['lower_tolerance'].tolist(), [-0.1, -0.1])
+        self.assertEqual(df['calculated_deviation'].tolist(), [0.02, -0.2])
+        self.assertEqual(df['status'].tolist(), ['PASS', 'FAIL'])
+
+
+
+# A two-dataset report: stats and a failing row in the first, no stats in the second
+REPORT = [
+    'CARL ZEISS CALYPSO 測定ﾌﾟﾗﾝ',
+    '円1 円(最小二乗法) 点数 (8) 内側',
+    'S= 0.002  Min=(3) -0.004  Max=(5) 0.003  形状= 0.007',
+    'X-値_円1 X 10.012 10.000 0.050 -0.050 0.012 ***',
+    'Y-値_円1 Y 7.080 7.000 0.050 -0.050 0.080',
+    'D 0.554 0.550 0.010 -0.010 0.004',
+    '==========',
+    '平面2 平面(最小二乗法) 点数 (12) 外側',
+    'Z-値_平面2 Z -1.001 -1.000 0.020 -0.020 -0.001',
+    '3 D 4.999 5.000 0.005 -0.005 -0.001',
+]
+
+
+def normalized(df):
+    """Object columns with every kind of missing value as None, for cross-backend comparison."""
+    df = df.astype(object)
+    return df.where(df.notna(), None)
+
+
+class TestDtypeBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = CMMParser()
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_pyarrow_frame_matches_numpy_frame(self):
+        for use_japanese_columns in (True, False):
+            numpy_df = self.parser.parse_lines_to_dataframe(REPORT, use_japanese_columns)
+            arrow_df = self.parser.parse_lines_to_dataframe(REPORT, use_japanese_columns, dtype_backend='pyarrow')
+            self.assertTrue(all(isinstance(dtype, pd.ArrowDtype) for dtype in arrow_df.dtypes))
+            pd.testing.assert_frame_equal(normalized(arrow_df), normalized(numpy_df))
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_pyarrow_through_parse_all_and_parse_file(self):
+        numpy_df = self.parser.parse_lines_to_dataframe(REPORT)
+        arrow_df, xy_df = self.parser.parse_all(REPORT, dtype_backend='pyarrow')
+        pd.testing.assert_frame_equal(normalized(arrow_df), normalized(numpy_df))
+        pd.testing.assert_frame_equal(xy_df, self.parser.parse_xy_coordinates(REPORT))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'report.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(REPORT))
+            file_df = self.parser.parse_file(path, dtype_backend='pyarrow')
+        pd.testing.assert_frame_equal(normalized(file_df), normalized(numpy_df))
+
+    @unittest.skipIf(pa is None, 'pyarrow is not installed')
+    def test_summary_accepts_pyarrow_frame(self):
+        numpy_summary = self.parser.create_summary_by_element(self.parser.parse_lines_to_dataframe(REPORT))
+        arrow_summary = self.parser.create_summary_by_element(
+            self.parser.parse_lines_to_dataframe(REPORT, dtype_backend='pyarrow')
+        )
+        self.assertEqual(arrow_summary['pass_count'].tolist(), [1, 2])
+        pd.testing.assert_frame_equal(normalized(arrow_summary), normalized(numpy_summary))
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ValueError):
+            self.parser.parse_lines_to_dataframe(REPORT, dtype_backend='arrow')
+        with self.assertRaises(ValueError):
+            self.parser.parse_all(REPORT, dtype_backend='arrow')
+
+    def test_pyarrow_backend_without_pyarrow_raises(self):
+        with mock.patch.object(cmm_measurement_parser, 'pa', None):
+            with self.assertRaises(ImportError):
+                self.parser.parse_lines_to_dataframe(REPORT, dtype_backend='pyarrow')
+
+
+class TestExcelExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        columns = {
+            'float': [1.5, np.nan, np.inf, -np.inf],
+            'int': [1, 2, 3, 4],
+            'bool': [True, False, True, False],
+            'object': ['a', None, np.nan, 3.0],
+            'category': pd.Categorical(['x', None, 'y', 'x']),
+            'nullable_int': pd.array([1, None, 3, 4], dtype='Int64'),
+            'datetime': pd.to_datetime(['2024-01-02 03:04:05', None, '2024-05-06 00:00:00', '2024-07-08 09:10:11']),
+            '要素名': ['円1', 'ｄ-2', '円3', None],
+        }
+        if pa is not None:
+            columns['arrow_float'] = pd.array([0.25, None, 2.0, -1.0], dtype=pd.ArrowDtype(pa.float64()))
+            columns['arrow_string'] = pd.array(['p', 'q', None, 'r'], dtype=pd.ArrowDtype(pa.string()))
+        self.df = pd.DataFrame(columns)
+
+    def assert_matches_to_excel(self):
+        filename = cmm_measurement_parser.export_to_excel(self.df, os.path.join(self.tmpdir.name, 'cmm'))
+        reference = os.path.join(self.tmpdir.name, 'reference.xlsx')
+        self.df.to_excel(reference, index=False)
+
+        pd.testing.assert_frame_equal(pd.read_excel(filename), pd.read_excel(reference))
+
+        # Datetimes must carry a date number format, not be bare serial numbers
+        from openpyxl import load_workbook
+        worksheet = load_workbook(filename).active
+        datetime_column = list(self.df.columns).index('datetime') + 1
+        self.assertEqual(worksheet.title, 'Sheet1')
+        self.assertIn('yy', worksheet.cell(row=2, column=datetime_column).number_format)
+
+    def test_openpyxl_matches_to_excel(self):
+        with mock.patch.object(cmm_measurement_parser, 'xlsxwriter', None):
+            self.assert_matches_to_excel()
+
+    @unittest.skipIf(xlsxwriter is None, 'xlsxwriter is not installed')
+    def test_xlsxwriter_matches_to_excel(self):
+        with mock.patch.object(cmm_measurement_parser, 'xlsxwriter', xlsxwriter):
+            self.assert_matches_to_excel()
+
+    def test_small_chunks_match_to_excel(self):
+        with mock.patch.object(cmm_measurement_parser, 'xlsxwriter', None):
+            path = os.path.join(self.tmpdir.name, 'chunked.xlsx')
+            cmm_measurement_parser._write_excel_rows(self.df, path, chunk_rows=3)
+            reference = os.path.join(self.tmpdir.name, 'reference.xlsx')
+            self.df.to_excel(reference, index=False)
+            pd.testing.assert_frame_equal(pd.read_excel(path), pd.read_excel(reference))
+
+
+if __name__ == '__main__':
+    unittest.main()